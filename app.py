@@ -2,11 +2,15 @@ from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import HTMLResponse
 import uvicorn
 from typing import List, Optional
+from functools import lru_cache
+import asyncio
 import json
+import os
 
 from core.models import ScanRequest, ScanResult, Framework
 from core.scanner import ComplianceScanner
 from core.reporter import ReportGenerator
+from core.result_store import ScanResultStore
 
 app = FastAPI(
     title="AI-Powered Compliance & Security Checker",
@@ -14,18 +18,30 @@ app = FastAPI(
     version="1.0.0"
 )
 
-scanner = ComplianceScanner()
+# Large scans fan out to one worker process per CPU
+scanner = ComplianceScanner(max_workers=os.cpu_count() or 1)
 reporter = ReportGenerator()
 
-# Store scan results (in production, use proper database)
-scan_cache = {}
+# Recent scan results stay in memory; all results are kept compressed under the reports dir
+scan_cache = ScanResultStore(reporter.reports_dir / "scans")
+
+@lru_cache(maxsize=32)
+def _render_html_report(scan_id: str) -> str:
+    """Render a cached scan result to HTML; results are immutable once stored."""
+    return reporter._render_html_template(scan_cache.get(scan_id))
+
+@app.on_event("shutdown")
+def shutdown_scanner():
+    """Stop the scanner's worker processes with the server."""
+    scanner.close()
 
 @app.post("/scan", response_model=ScanResult)
 async def scan_paths(request: ScanRequest):
     """Scan the provided paths for compliance violations."""
     try:
-        result = scanner.scan_paths(request.paths, request.frameworks)
-        scan_cache[result.scan_id] = result
+        result = await scanner.scan_paths_async(request.paths, request.frameworks)
+        # Writing the compressed result is blocking file I/O; keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, scan_cache.put, result)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scan failed: {str(e)}")
@@ -36,13 +52,15 @@ async def get_report(
     format: str = Query(default="json", regex="^(json|html)$")
 ):
     """Retrieve a scan report in JSON or HTML format."""
-    if scan_id not in scan_cache:
+    # A result evicted from memory is read back from disk, and HTML is rendered with Jinja;
+    # both block, so run them off the event loop
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, scan_cache.get, scan_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Scan result not found")
     
-    result = scan_cache[scan_id]
-    
     if format == "html":
-        html_content = reporter._render_html_template(result)
+        html_content = await loop.run_in_executor(None, _render_html_report, scan_id)
         return HTMLResponse(content=html_content)
     else:
         return result
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import click
 import json
+import os
 import sys
 from pathlib import Path
 from rich.console import Console
@@ -25,18 +26,24 @@ def cli():
               type=click.Choice(['json', 'html']), help='Output format(s)')
 @click.option('--framework', multiple=True, type=click.Choice(['iso27001', 'soc2', 'gdpr']), 
               help='Limit scan to specific frameworks')
-def scan(paths, out, formats, framework):
+@click.option('--no-rule-cache', is_flag=True, help='Parse rule YAML files instead of using the on-disk rule cache')
+@click.option('--no-result-cache', is_flag=True, help='Rescan every file instead of reusing findings for unchanged files')
+def scan(paths, out, formats, framework, no_rule_cache, no_result_cache):
     """Scan paths for compliance violations."""
     console.print("🔍 Starting compliance scan...", style="bold blue")
     
-    scanner = ComplianceScanner()
+    scanner = ComplianceScanner(max_workers=os.cpu_count() or 1, rule_cache=not no_rule_cache,
+                                result_cache=not no_result_cache)
     reporter = ReportGenerator(out)
     
     # Convert framework strings to enum objects
     framework_enums = [Framework(f) for f in framework] if framework else None
     
     # Perform scan
-    result = scanner.scan_paths(list(paths), framework_enums)
+    try:
+        result = scanner.scan_paths(list(paths), framework_enums)
+    finally:
+        scanner.close()
     
     # Display summary
     _display_scan_summary(result)
@@ -55,9 +62,9 @@ def scan(paths, out, formats, framework):
     for file_path in output_files:
         console.print(f"  • {file_path}")
     
-    # Return exit code based on severity of findings
-    critical_count = sum(1 for f in result.findings if f.severity == "critical")
-    high_count = sum(1 for f in result.findings if f.severity == "high")
+    # Return exit code based on severity of findings (already tallied in the summary)
+    critical_count = result.summary.findings_by_severity["critical"]
+    high_count = result.summary.findings_by_severity["high"]
     
     if critical_count > 0:
         sys.exit(2)  # Critical issues found
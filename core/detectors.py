@@ -1,8 +1,39 @@
 import re
-from typing import List, Dict, Any
+import sys
+import json
+from typing import List, Dict, Any, FrozenSet, Set, Tuple
 from pathlib import Path
-from .models import Finding, Framework, Severity
-import uuid
+from .models import Finding, Framework, Severity, new_finding_id
+
+# Config misconfiguration patterns, one per check in ConfigMisconfigDetector.CHECKS. Separate
+# searches keep each pattern's literal-prefix speedup and let every check stop at its first hit
+_CONFIG_PATTERNS = {
+    'tls': re.compile(r'ssl\s*[:=]\s*false|verify\s*[:=]\s*false|tls\s*[:=]\s*false', re.IGNORECASE),
+    'iam': re.compile(r'\{(?=[^}]{0,500}?"Action"\s*:\s*"\*")(?=[^}]{0,500}?"Resource"\s*:\s*"\*")'),
+    'pub': re.compile(r'"public"\s*:\s*true|public\s*=\s*true', re.IGNORECASE),
+    # Bounded so a "cipher" key cannot pair with an algorithm name far along a minified line
+    'weak': re.compile(r'cipher[^\n]{0,40}(?:RC4|DES|MD5)', re.IGNORECASE),
+}
+
+# Policy document indicators: one case-insensitive pass that stops at the first hit, no lowercased copy
+_POLICY_RE = re.compile(r'policy|procedure|guideline|standard|privacy|security', re.IGNORECASE)
+
+def _is_wildcard(value: Any) -> bool:
+    """Return True for "*" or a list containing "*"."""
+    return value == "*" or (isinstance(value, list) and "*" in value)
+
+def _has_wildcard_statement(document: Any) -> bool:
+    """Return True if any object in a parsed JSON document allows "*" actions on "*" resources."""
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if _is_wildcard(node.get("Action")) and _is_wildcard(node.get("Resource")):
+                return True
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
 
 class DocumentGapDetector:
     """Detect missing sections in policy documents."""
@@ -26,6 +57,33 @@ class DocumentGapDetector:
         ]
     }
     
+    def __init__(self):
+        keywords = {
+            keyword.lower()
+            for sections in self.REQUIRED_SECTIONS.values()
+            for section in sections
+            for keyword in section['keywords']
+        }
+        # Lowercased once here; keywords shared between sections are searched for only once
+        self._keywords: FrozenSet[str] = frozenset(keywords)
+        
+        # Finding text depends only on the section, so build it once and share it across findings
+        self._section_checks: List[Tuple[Framework, List[str], Dict[str, str]]] = []
+        for framework, sections in self.REQUIRED_SECTIONS.items():
+            for section in sections:
+                keywords_text = ', '.join(section['keywords'])
+                self._section_checks.append((
+                    framework,
+                    [keyword.lower() for keyword in section['keywords']],
+                    {
+                        'rule_id': sys.intern(f"doc_gap_{framework.value}_{section['control_id'].replace('.', '_').replace(' ', '_')}"),
+                        'control_id': sys.intern(section['control_id']),
+                        'evidence_snippet': f"Missing section: {keywords_text}",
+                        'why_it_matters': f"Policy documents should address {section['keywords'][0]} requirements for {framework.value} compliance",
+                        'remediation_steps': f"Add a section covering {keywords_text} in the policy document",
+                    }
+                ))
+    
     def scan_document(self, file_path: Path, content: str) -> List[Finding]:
         """Scan policy documents for missing sections."""
         findings = []
@@ -34,91 +92,99 @@ class DocumentGapDetector:
         if not self._is_policy_document(content):
             return findings
         
-        content_lower = content.lower()
+        present = self._find_keywords(content)
+        file_path_str = str(file_path)
         
-        for framework, sections in self.REQUIRED_SECTIONS.items():
-            for section in sections:
-                if not any(keyword in content_lower for keyword in section['keywords']):
-                    finding = Finding(
-                        id=str(uuid.uuid4()),
-                        rule_id=f"doc_gap_{framework.value}_{section['control_id'].replace('.', '_').replace(' ', '_')}",
-                        framework=framework,
-                        control_id=section['control_id'],
-                        severity=Severity.MEDIUM,
-                        file_path=str(file_path),
-                        line_range="1-end",
-                        evidence_snippet=f"Missing section: {', '.join(section['keywords'])}",
-                        why_it_matters=f"Policy documents should address {section['keywords'][0]} requirements for {framework.value} compliance",
-                        remediation_steps=f"Add a section covering {', '.join(section['keywords'])} in the policy document",
-                        mapping_confidence="medium",
-                        needs_review=True
-                    )
-                    findings.append(finding)
+        for framework, keywords, text in self._section_checks:
+            if not any(keyword in present for keyword in keywords):
+                finding = Finding(
+                    id=new_finding_id(),
+                    framework=framework,
+                    severity=Severity.MEDIUM,
+                    file_path=file_path_str,
+                    line_range="1-end",
+                    mapping_confidence="medium",
+                    needs_review=True,
+                    **text
+                )
+                findings.append(finding)
         
         return findings
     
+    def _find_keywords(self, content: str) -> Set[str]:
+        """Return the lowercased section keywords that occur in content."""
+        # A handful of C-level substring searches beat any regex alternation over the whole document
+        content_lower = content.lower()
+        return {keyword for keyword in self._keywords if keyword in content_lower}
+    
     def _is_policy_document(self, content: str) -> bool:
         """Heuristic to identify policy documents."""
-        policy_indicators = ['policy', 'procedure', 'guideline', 'standard', 'privacy', 'security']
-        content_lower = content.lower()
-        return any(indicator in content_lower for indicator in policy_indicators)
+        return _POLICY_RE.search(content) is not None
 
 class ConfigMisconfigDetector:
     """Detect security misconfigurations in config files."""
     
+    # Key in _CONFIG_PATTERNS -> (rule_id, framework, control_id, severity, evidence, why, remediation)
+    CHECKS = {
+        'tls': (
+            "disabled_tls", Framework.ISO27001, "A.13",
+            Severity.HIGH, "TLS/SSL disabled in configuration",
+            "Disabled encryption exposes data in transit to interception",
+            "Enable TLS/SSL and certificate verification"
+        ),
+        'iam': (
+            "broad_iam", Framework.SOC2, "CC 6.2",
+            Severity.CRITICAL, "Overly broad IAM permissions",
+            "Wildcard permissions violate principle of least privilege",
+            "Restrict actions and resources to specific required permissions"
+        ),
+        'pub': (
+            "public_storage", Framework.GDPR, "Article 32",
+            Severity.HIGH, "Public storage configuration",
+            "Public access may expose personal data",
+            "Review and restrict public access to necessary resources only"
+        ),
+        'weak': (
+            "weak_cipher", Framework.ISO27001, "A.10",
+            Severity.HIGH, "Weak cipher suites configured",
+            "Weak cryptographic algorithms are vulnerable to attacks",
+            "Use strong cipher suites (AES-256, SHA-256 or higher)"
+        ),
+    }
+    
     def scan_config(self, file_path: Path, content: str) -> List[Finding]:
         """Scan configuration files for security issues."""
         findings = []
         
-        # Disabled TLS/SSL
-        if re.search(r'ssl\s*[:=]\s*false|verify\s*[:=]\s*false|tls\s*[:=]\s*false', content, re.IGNORECASE):
-            findings.append(self._create_config_finding(
-                file_path, "disabled_tls", Framework.ISO27001, "A.13",
-                Severity.HIGH, "TLS/SSL disabled in configuration",
-                "Disabled encryption exposes data in transit to interception",
-                "Enable TLS/SSL and certificate verification"
-            ))
-        
-        # Overly broad IAM permissions
-        if re.search(r'"Action"\s*:\s*"\*".*"Resource"\s*:\s*"\*"', content) or \
-           re.search(r'"Resource"\s*:\s*"\*".*"Action"\s*:\s*"\*"', content):
-            findings.append(self._create_config_finding(
-                file_path, "broad_iam", Framework.SOC2, "CC 6.2",
-                Severity.CRITICAL, "Overly broad IAM permissions",
-                "Wildcard permissions violate principle of least privilege",
-                "Restrict actions and resources to specific required permissions"
-            ))
+        # JSON policies are checked structurally, which also catches list-valued Action/Resource
+        structural_iam = None
+        if file_path.suffix == '.json':
+            try:
+                structural_iam = _has_wildcard_statement(json.loads(content))
+            except (ValueError, RecursionError):
+                pass
         
-        # Public bucket/storage
-        if re.search(r'"public"[\s\n]*:[\s\n]*true|public[\s]*=[\s]*true', content, re.IGNORECASE):
-            findings.append(self._create_config_finding(
-                file_path, "public_storage", Framework.GDPR, "Article 32",
-                Severity.HIGH, "Public storage configuration",
-                "Public access may expose personal data",
-                "Review and restrict public access to necessary resources only"
-            ))
-        
-        # Weak cipher suites
-        if re.search(r'cipher.*RC4|cipher.*DES|cipher.*MD5', content, re.IGNORECASE):
-            findings.append(self._create_config_finding(
-                file_path, "weak_cipher", Framework.ISO27001, "A.10",
-                Severity.HIGH, "Weak cipher suites configured",
-                "Weak cryptographic algorithms are vulnerable to attacks",
-                "Use strong cipher suites (AES-256, SHA-256 or higher)"
-            ))
+        file_path_str = str(file_path)
+        for group, check in self.CHECKS.items():
+            if group == 'iam' and structural_iam is not None:
+                fired = structural_iam
+            else:
+                fired = _CONFIG_PATTERNS[group].search(content) is not None
+            if fired:
+                findings.append(self._create_config_finding(file_path_str, *check))
         
         return findings
     
-    def _create_config_finding(self, file_path: Path, rule_id: str, framework: Framework, 
+    def _create_config_finding(self, file_path: str, rule_id: str, framework: Framework, 
                              control_id: str, severity: Severity, evidence: str,
                              why: str, remediation: str) -> Finding:
         return Finding(
-            id=str(uuid.uuid4()),
+            id=new_finding_id(),
             rule_id=rule_id,
             framework=framework,
             control_id=control_id,
             severity=severity,
-            file_path=str(file_path),
+            file_path=file_path,
             line_range="1-end",
             evidence_snippet=evidence,
             why_it_matters=why,
@@ -126,15 +192,17 @@ class ConfigMisconfigDetector:
             mapping_confidence="high"
         )
 
+# Luhn lookup tables: strip separators, map ASCII digits to 0-9, map 0-9 to the digit sum of their double
+_LUHN_STRIP = str.maketrans('', '', ' -')
+_DIGIT_VALUES = bytes.maketrans(b'0123456789', bytes(range(10)))
+_LUHN_DOUBLED = bytes.maketrans(bytes(range(10)), bytes((0, 2, 4, 6, 8, 1, 3, 5, 7, 9)))
+
 def luhn_check(card_number: str) -> bool:
     """Validate credit card number using Luhn algorithm."""
-    def digits_of(n):
-        return [int(d) for d in str(n)]
+    digits = card_number.translate(_LUHN_STRIP).encode('ascii')
+    if digits and not digits.isdigit():
+        raise ValueError(f"Invalid card number: {card_number!r}")
     
-    digits = digits_of(card_number.replace(' ', '').replace('-', ''))
-    odd_digits = digits[-1::-2]
-    even_digits = digits[-2::-2]
-    checksum = sum(odd_digits)
-    for d in even_digits:
-        checksum += sum(digits_of(d*2))
+    values = digits.translate(_DIGIT_VALUES)
+    checksum = sum(values[-1::-2]) + sum(values[-2::-2].translate(_LUHN_DOUBLED))
     return checksum % 10 == 0
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from .models import Finding, Framework, new_finding_id
+
+# Modules whose code decides what a file's findings are; any edit or upgrade to them invalidates the cache
+_FINDING_SOURCES = ('models.py', 'rule_engine.py', 'detectors.py', 'scanner.py', 'finding_cache.py')
+
+def _code_digest() -> str:
+    """Hash the source of the finding-producing modules, or return a per-process value if unreadable."""
+    digest = hashlib.blake2b(digest_size=8)
+    try:
+        for name in _FINDING_SOURCES:
+            digest.update((Path(__file__).parent / name).read_bytes())
+    except OSError:
+        # Without the source (e.g. a zipped install) nothing can be proven current; never reuse rows
+        return os.urandom(8).hex()
+    return digest.hexdigest()
+
+_CODE_DIGEST = _code_digest()
+
+_FINDINGS_ADAPTER = TypeAdapter(List[Finding])
+
+# (file path, scope, content digest)
+CacheKey = Tuple[str, str, bytes]
+
+class FindingCache:
+    """Persist each file's findings, reused while its content and the rule set are unchanged.
+    
+    One sqlite database is shared by the scanner and its worker processes. Rows are keyed by
+    file path and scope (hash of the scanner's own source, rules hash and selected frameworks)
+    and hold the hash of the content they were computed from, so an edited file replaces its
+    own row and any code change starts a fresh scope. Rows not written for max_age seconds,
+    and the oldest rows beyond max_rows, are pruned when a process first opens the database.
+    Any database error is treated as a cache miss.
+    """
+    
+    def __init__(self, db_path: Path, rules_hash: str, max_rows: int = 50_000,
+                 max_age: float = 30 * 24 * 3600):
+        self.db_path = Path(db_path)
+        self.rules_hash = rules_hash
+        self.max_rows = max_rows
+        self.max_age = max_age
+        # sqlite connections cannot be shared across processes, so keep one per process and thread
+        self._connections: Dict[Tuple[int, int], sqlite3.Connection] = {}
+        self._pruned_pid: Optional[int] = None
+        self._disabled = False
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connections'] = {}
+        state['_pruned_pid'] = None
+        return state
+    
+    def key(self, file_path: Path, data: bytes, frameworks: Optional[FrozenSet[Framework]] = None) -> CacheKey:
+        """Return the cache key for a file's raw bytes scanned for the given frameworks."""
+        selected = ','.join(sorted(framework.value for framework in frameworks)) if frameworks else '*'
+        scope = f"{_CODE_DIGEST}:{self.rules_hash}:{selected}"
+        return str(file_path), scope, hashlib.blake2b(data, digest_size=16).digest()
+    
+    def get(self, key: CacheKey) -> Optional[List[Finding]]:
+        """Return the cached findings for key with fresh IDs, or None on a miss."""
+        path, scope, digest = key
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT digest, findings FROM findings WHERE path = ? AND scope = ?", (path, scope)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or row[0] != digest:
+            return None
+        
+        try:
+            findings = _FINDINGS_ADAPTER.validate_json(row[1])
+        except ValueError:
+            return None
+        # IDs must stay unique across scans
+        for finding in findings:
+            finding.id = new_finding_id()
+        return findings
+    
+    def put(self, key: CacheKey, findings: List[Finding]):
+        """Store the findings for key, replacing any row for an older version of the file."""
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO findings (path, scope, digest, findings, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (*key, _FINDINGS_ADAPTER.dump_json(findings), time.time())
+            )
+        except sqlite3.Error:
+            pass
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Return this thread's connection, or None if the database cannot be opened."""
+        if self._disabled:
+            return None
+        owner = (os.getpid(), threading.get_ident())
+        conn = self._connections.get(owner)
+        if conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                # Autocommit; WAL lets workers read while one writes, and a lost write is only a miss
+                conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS findings ("
+                    "path TEXT NOT NULL, scope TEXT NOT NULL, digest BLOB NOT NULL, findings BLOB NOT NULL, "
+                    "stored_at REAL NOT NULL, PRIMARY KEY (path, scope))"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS findings_stored_at ON findings (stored_at)")
+                if self._pruned_pid != owner[0]:
+                    self._prune(conn)
+                    self._pruned_pid = owner[0]
+            except (OSError, sqlite3.Error):
+                # A read-only or missing cache dir is not an error; scan without the cache
+                self._disabled = True
+                return None
+            self._connections[owner] = conn
+        return conn
+    
+    def _prune(self, conn: sqlite3.Connection):
+        """Drop rows that have not been written recently, then the oldest rows beyond max_rows.
+        
+        Stale scopes (old rule sets, older scanner code) and paths that are no longer scanned,
+        such as temporary directories, stop being written and so age out.
+        """
+        conn.execute("DELETE FROM findings WHERE stored_at < ?", (time.time() - self.max_age,))
+        conn.execute(
+            "DELETE FROM findings WHERE rowid IN "
+            "(SELECT rowid FROM findings ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        )
@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
+import itertools
+import os
+import uuid
 
 class Severity(str, Enum):
     CRITICAL = "critical"
@@ -14,6 +17,23 @@ class Framework(str, Enum):
     SOC2 = "soc2"
     GDPR = "gdpr"
 
+# Finding IDs are a random per-process prefix plus a counter: unique without a urandom read per finding
+_finding_id_prefix = uuid.uuid4().hex
+_finding_id_counter = itertools.count(1)
+
+def _reset_finding_ids():
+    global _finding_id_prefix, _finding_id_counter
+    _finding_id_prefix = uuid.uuid4().hex
+    _finding_id_counter = itertools.count(1)
+
+# Forked workers must not reuse the parent's prefix (fork, and this hook, exist only on Unix)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_finding_ids)
+
+def new_finding_id() -> str:
+    """Return an ID that is unique across findings, scans and processes."""
+    return f"{_finding_id_prefix}-{next(_finding_id_counter)}"
+
 class Finding(BaseModel):
     id: str
     rule_id: str
@@ -1,53 +1,12 @@
-import json
 import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
-from jinja2 import Template
+from jinja2 import Environment
 
 from .models import ScanResult
 
-class ReportGenerator:
-    def __init__(self, reports_dir: str = "reports"):
-        self.reports_dir = Path(reports_dir)
-        self.reports_dir.mkdir(exist_ok=True)
-    
-    def generate_json_report(self, scan_result: ScanResult, output_path: str = None) -> str:
-        """Generate JSON report from scan results."""
-        if not output_path:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.reports_dir / f"compliance_report_{timestamp}.json"
-        
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Convert to dict for JSON serialization
-        report_data = scan_result.model_dump(mode='json')
-        
-        with open(output_path, 'w') as f:
-            json.dump(report_data, f, indent=2, default=str)
-        
-        return str(output_path)
-    
-    def generate_html_report(self, scan_result: ScanResult, output_path: str = None) -> str:
-        """Generate HTML report from scan results."""
-        if not output_path:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.reports_dir / f"compliance_report_{timestamp}.html"
-        
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        html_content = self._render_html_template(scan_result)
-        
-        with open(output_path, 'w') as f:
-            f.write(html_content)
-        
-        return str(output_path)
-    
-    def _render_html_template(self, scan_result: ScanResult) -> str:
-        """Render HTML report using Jinja2 template."""
-        template_str = """
+_HTML_TEMPLATE_STR = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -176,6 +135,46 @@ class ReportGenerator:
 </body>
 </html>
         """
+
+# Parsed and compiled once at import; autoescape keeps file paths and evidence from injecting markup
+_HTML_TEMPLATE = Environment(autoescape=True).from_string(_HTML_TEMPLATE_STR)
+
+class ReportGenerator:
+    def __init__(self, reports_dir: str = "reports"):
+        self.reports_dir = Path(reports_dir)
+        self.reports_dir.mkdir(exist_ok=True)
+    
+    def generate_json_report(self, scan_result: ScanResult, output_path: str = None) -> str:
+        """Generate JSON report from scan results."""
+        if not output_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = self.reports_dir / f"compliance_report_{timestamp}.json"
+        
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Serialize straight from the model (pydantic-core) without building an intermediate dict
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(scan_result.model_dump_json(indent=2))
+        
+        return str(output_path)
+    
+    def generate_html_report(self, scan_result: ScanResult, output_path: str = None) -> str:
+        """Generate HTML report from scan results."""
+        if not output_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = self.reports_dir / f"compliance_report_{timestamp}.html"
+        
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        template = Template(template_str)
-        return template.render(scan_result=scan_result)
+        html_content = self._render_html_template(scan_result)
+        
+        with open(output_path, 'w') as f:
+            f.write(html_content)
+        
+        return str(output_path)
+    
+    def _render_html_template(self, scan_result: ScanResult) -> str:
+        """Render HTML report using Jinja2 template."""
+        return _HTML_TEMPLATE.render(scan_result=scan_result)
@@ -0,0 +1,62 @@
+import gzip
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .models import ScanResult
+
+class ScanResultStore:
+    """Keep recent scan results in memory and every result compressed on disk."""
+    
+    def __init__(self, store_dir: str = "reports/scans", maxsize: int = 32):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self._recent: "OrderedDict[str, ScanResult]" = OrderedDict()
+        # put and get run on different threads (executor and event loop) in the API
+        self._lock = threading.Lock()
+    
+    def put(self, result: ScanResult):
+        """Persist a scan result and keep it in the in-memory LRU."""
+        # Write then rename, so a concurrent get never reads a half-written file
+        path = self._path(result.scan_id)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, 'wb') as f:
+            f.write(result.model_dump_json().encode('utf-8'))
+        os.replace(tmp_path, path)
+        self._remember(result)
+    
+    def get(self, scan_id: str) -> Optional[ScanResult]:
+        """Return a scan result from memory, falling back to disk; None if unknown."""
+        with self._lock:
+            result = self._recent.get(scan_id)
+            if result is not None:
+                self._recent.move_to_end(scan_id)
+                return result
+        
+        # Only well-formed scan IDs may be turned into a file path
+        try:
+            uuid.UUID(scan_id)
+        except ValueError:
+            return None
+        
+        path = self._path(scan_id)
+        if not path.is_file():
+            return None
+        with gzip.open(path, 'rb') as f:
+            result = ScanResult.model_validate_json(f.read())
+        self._remember(result)
+        return result
+    
+    def _remember(self, result: ScanResult):
+        with self._lock:
+            self._recent[result.scan_id] = result
+            self._recent.move_to_end(result.scan_id)
+            while len(self._recent) > self.maxsize:
+                self._recent.popitem(last=False)
+    
+    def _path(self, scan_id: str) -> Path:
+        return self.store_dir / f"{scan_id}.json.gz"
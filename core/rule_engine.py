@@ -1,64 +1,211 @@
 import yaml
 import re
 import os
-from typing import Dict, List, Any
+import sys
+import fnmatch
+import hashlib
+import pickle
+import copy
+from typing import Dict, List, Any, FrozenSet, Optional, Pattern, Tuple, Iterable
 from pathlib import Path
-from .models import Framework, Severity, Finding
-import uuid
+from .models import Framework, Severity, Finding, new_finding_id
+
+# Redaction patterns for evidence snippets, compiled once and applied in order.
+# They must stay separate sequential passes: each pass sees the previous pass's masks, so e.g.
+# an email is masked before the secret pass could swallow its local part and leave the domain.
+_REDACTIONS = (
+    (re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), '****@****.***'),  # Email addresses
+    (re.compile(r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b'), '****-****-****-****'),       # Credit card numbers (basic pattern)
+    (re.compile(r'\b\d{3}[- ]?\d{3}[- ]?\d{4}\b'), '***-***-****'),                        # Phone numbers
+    (re.compile(r'\b[A-Za-z0-9+/]{20,}\b'), '****[REDACTED]****'),                           # API keys and secrets (long alphanumeric strings)
+)
+
+# Globs of the form "*.ext" depend only on the file suffix and can be indexed
+_SUFFIX_GLOB_RE = re.compile(r'\*(\.[^*?\[\]/.]+)')
+
+def _file_suffix(name: str) -> str:
+    """Return the text from the last dot of a file name, matching what "*.ext" globs test."""
+    dot = name.rfind('.')
+    return name[dot:] if dot != -1 else ''
+
+# Bump when Rule's attributes change so stale pickled rule sets are ignored
+_RULE_CACHE_VERSION = 2
+
+def _rule_cache_dir() -> Path:
+    """Directory holding pickled rule sets, keyed by a hash of the YAML sources."""
+    return Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "compliance_check"
+
+# libyaml's C loader when PyYAML was built with it, else the pure-Python one
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 class Rule:
     def __init__(self, rule_data: Dict[str, Any]):
-        self.id = rule_data['id']
+        # Every finding for this rule shares these strings; interning also dedupes text repeated across rules
+        self.id = sys.intern(rule_data['id'])
         self.framework = Framework(rule_data['framework'])
-        self.control_id = rule_data['control_id']
+        self.control_id = sys.intern(rule_data['control_id'])
         self.severity = Severity(rule_data['severity'])
         self.pattern = re.compile(rule_data['pattern'], re.IGNORECASE | re.MULTILINE)
         self.file_globs = rule_data.get('file_globs', ['*'])
-        self.why_it_matters = rule_data['why_it_matters']
-        self.remediation_steps = rule_data['remediation_steps']
-        self.mapping_confidence = rule_data.get('mapping_confidence', 'high')
+        # Optional extension filter on top of the globs, e.g. ['.py', '.yml']; None means any extension
+        applies_to = rule_data.get('applies_to')
+        if applies_to is not None and (
+                not isinstance(applies_to, list) or not all(isinstance(ext, str) and ext for ext in applies_to)):
+            raise ValueError(f"Rule {rule_data['id']}: applies_to must be a list of file extensions")
+        self.applies_to: Optional[FrozenSet[str]] = None if applies_to is None else frozenset(
+            sys.intern(ext if ext.startswith('.') else '.' + ext) for ext in applies_to
+        )
+        self.why_it_matters = sys.intern(rule_data['why_it_matters'])
+        self.remediation_steps = sys.intern(rule_data['remediation_steps'])
+        self.mapping_confidence = sys.intern(rule_data.get('mapping_confidence', 'high'))
         self.needs_review = rule_data.get('needs_review', False)
+        
+        # Findings are built without validation, so check the fields Finding would reject here
+        if self.mapping_confidence not in ('high', 'medium', 'low'):
+            raise ValueError(f"Rule {self.id}: invalid mapping_confidence {self.mapping_confidence!r}")
+        if not isinstance(self.needs_review, bool):
+            raise ValueError(f"Rule {self.id}: needs_review must be a boolean")
 
 class RuleEngine:
-    def __init__(self, rules_dir: str = "rules"):
+    def __init__(self, rules_dir: str = "rules", use_cache: bool = True):
         self.rules: List[Rule] = []
         self.rules_dir = Path(rules_dir)
+        self.use_cache = use_cache
+        self.rules_hash = ""
+        # Glob index: suffix ("*" for match-all) -> rules, plus rules with globs the index cannot express
+        self._rules_by_suffix: Dict[str, List[Rule]] = {}
+        self._glob_rules: List[Tuple[Rule, List[Pattern]]] = []
+        self._rule_order: Dict[Rule, int] = {}
+        # Suffix -> applicable indexed rules, in load order
+        self._suffix_cache: Dict[str, Tuple[Rule, ...]] = {}
+        # Framework subset -> engine limited to those frameworks (see view())
+        self._views: Dict[FrozenSet[Framework], 'RuleEngine'] = {}
         self.load_rules()
     
     def load_rules(self):
-        """Load all YAML rule files from rules directory."""
-        for rule_file in self.rules_dir.glob("*.yaml"):
-            with open(rule_file, 'r') as f:
-                rule_data = yaml.safe_load(f)
+        """Load all YAML rule files from rules directory, reusing the on-disk cache when unchanged."""
+        rule_sources = [(rule_file, rule_file.read_bytes()) for rule_file in sorted(self.rules_dir.glob("*.yaml"))]
+        
+        digest = hashlib.blake2b(str(_RULE_CACHE_VERSION).encode(), digest_size=16)
+        for rule_file, source in rule_sources:
+            digest.update(rule_file.name.encode() + b'\0')
+            digest.update(source)
+        self.rules_hash = digest.hexdigest()
+        cache_path = _rule_cache_dir() / f"rules-{self.rules_hash}.pkl"
+        
+        rules = self._load_cached_rules(cache_path) if self.use_cache else None
+        if rules is None:
+            rules = []
+            for rule_file, source in rule_sources:
+                rule_data = yaml.load(source, Loader=_YamlLoader)
                 for rule_dict in rule_data.get('rules', []):
-                    self.rules.append(Rule(rule_dict))
+                    rules.append(Rule(rule_dict))
+            if self.use_cache:
+                self._store_cached_rules(cache_path, rules)
+        
+        self.rules.extend(rules)
+        self._index_rules()
+    
+    def _load_cached_rules(self, cache_path: Path) -> Optional[List[Rule]]:
+        """Return the pickled rules at cache_path, or None if missing or unreadable."""
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+    
+    def _store_cached_rules(self, cache_path: Path, rules: List[Rule]):
+        """Pickle rules to cache_path; a read-only or missing cache dir is not an error."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(rules, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    
+    def _index_rules(self):
+        """Bucket rules by the file suffixes their globs (and applies_to) accept."""
+        self._rules_by_suffix = {}
+        self._glob_rules = []
+        self._rule_order = {rule: i for i, rule in enumerate(self.rules)}
+        self._suffix_cache.clear()
+        self._views.clear()
+        
+        for rule in self.rules:
+            other_globs = []
+            for glob in rule.file_globs:
+                suffix_match = _SUFFIX_GLOB_RE.fullmatch(glob)
+                if glob == '*':
+                    for suffix in rule.applies_to or ('*',):
+                        self._rules_by_suffix.setdefault(suffix, []).append(rule)
+                elif suffix_match:
+                    if rule.applies_to is None or suffix_match.group(1) in rule.applies_to:
+                        self._rules_by_suffix.setdefault(suffix_match.group(1), []).append(rule)
+                elif '/' in glob:
+                    # Multi-part globs still need Path.match semantics
+                    other_globs.append(glob)
+                else:
+                    other_globs.append(re.compile(fnmatch.translate(glob)))
+            if other_globs:
+                self._glob_rules.append((rule, other_globs))
+    
+    def view(self, frameworks: Iterable[Framework]) -> 'RuleEngine':
+        """Return an engine that only applies rules for the given frameworks.
+        
+        The view shares this engine's Rule objects and compiled patterns; only the indexes are
+        rebuilt. Views are cached per framework set.
+        """
+        key = frozenset(frameworks)
+        view = self._views.get(key)
+        if view is None:
+            view = copy.copy(self)
+            view.rules = [rule for rule in self.rules if rule.framework in key]
+            view._suffix_cache = {}
+            view._views = {}
+            view._index_rules()
+            self._views[key] = view
+        return view
     
     def scan_file(self, file_path: Path, content: str) -> List[Finding]:
         """Scan a single file against all applicable rules."""
         findings = []
         
-        for rule in self.rules:
-            # Check if file matches glob patterns
-            if not any(file_path.match(glob) for glob in rule.file_globs):
-                continue
+        rules = self._applicable_rules(file_path)
+        if not rules:
+            return findings
+        
+        file_path_str = str(file_path)
+        
+        for rule in rules:
+            # Matches arrive in document order, so line numbers are counted incrementally
+            # between consecutive matches instead of re-counting from the top of the file
+            line = 0
+            counted_to = 0
             
             # Find all matches
             for match in rule.pattern.finditer(content):
-                line_num = content[:match.start()].count('\n') + 1
-                line_end = content[:match.end()].count('\n') + 1
+                line += content.count('\n', counted_to, match.start())
+                counted_to = match.start()
+                
+                # 0-based line indexes of the match start and end
+                start_line = line
+                end_line = line + content.count('\n', match.start(), match.end())
                 
                 # Extract evidence snippet and redact sensitive data
                 evidence = self._extract_evidence(content, match.start(), match.end())
                 evidence_redacted = self._redact_sensitive_data(evidence)
                 
-                finding = Finding(
-                    id=str(uuid.uuid4()),
+                # Every field comes from a validated Rule or is computed here, so skip pydantic validation
+                finding = Finding.model_construct(
+                    id=new_finding_id(),
                     rule_id=rule.id,
                     framework=rule.framework,
                     control_id=rule.control_id,
                     severity=rule.severity,
-                    file_path=str(file_path),
-                    line_range=f"{line_num}-{line_end}",
+                    file_path=file_path_str,
+                    line_range=f"{start_line + 1}-{end_line + 1}",
                     evidence_snippet=evidence_redacted,
                     why_it_matters=rule.why_it_matters,
                     remediation_steps=rule.remediation_steps,
@@ -69,31 +216,52 @@ class RuleEngine:
         
         return findings
     
+    def _applicable_rules(self, file_path: Path) -> Tuple[Rule, ...]:
+        """Return the rules whose file globs match the given path, in load order."""
+        name = file_path.name
+        suffix = _file_suffix(name)
+        
+        rules = self._suffix_cache.get(suffix)
+        if rules is None:
+            indexed = set(self._rules_by_suffix.get(suffix, [])) | set(self._rules_by_suffix.get('*', []))
+            rules = tuple(sorted(indexed, key=self._rule_order.__getitem__))
+            self._suffix_cache[suffix] = rules
+        
+        if not self._glob_rules:
+            return rules
+        
+        extra = [
+            rule for rule, globs in self._glob_rules
+            if rule not in rules and (rule.applies_to is None or suffix in rule.applies_to) and any(
+                file_path.match(glob) if isinstance(glob, str) else glob.match(name)
+                for glob in globs
+            )
+        ]
+        if not extra:
+            return rules
+        return tuple(sorted(rules + tuple(extra), key=self._rule_order.__getitem__))
+    
     def _extract_evidence(self, content: str, start: int, end: int) -> str:
         """Extract a snippet around the match for evidence."""
-        lines = content.split('\n')
-        start_line = content[:start].count('\n')
-        end_line = content[:end].count('\n')
+        # Include some context (2 lines before/after), sliced straight out of content
+        snippet_start = content.rfind('\n', 0, start) + 1
+        for _ in range(2):
+            if snippet_start == 0:
+                break
+            snippet_start = content.rfind('\n', 0, snippet_start - 1) + 1
         
-        # Include some context (2 lines before/after)
-        context_start = max(0, start_line - 2)
-        context_end = min(len(lines), end_line + 3)
+        snippet_end = content.find('\n', end)
+        for _ in range(2):
+            if snippet_end == -1:
+                break
+            snippet_end = content.find('\n', snippet_end + 1)
+        if snippet_end == -1:
+            snippet_end = len(content)
         
-        evidence_lines = lines[context_start:context_end]
-        return '\n'.join(evidence_lines)
+        return content[snippet_start:snippet_end]
     
     def _redact_sensitive_data(self, text: str) -> str:
         """Redact sensitive patterns in evidence snippets."""
-        # Email addresses
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '****@****.***', text)
-        
-        # Credit card numbers (basic pattern)
-        text = re.sub(r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b', '****-****-****-****', text)
-        
-        # Phone numbers
-        text = re.sub(r'\b\d{3}[- ]?\d{3}[- ]?\d{4}\b', '***-***-****', text)
-        
-        # API keys and secrets (long alphanumeric strings)
-        text = re.sub(r'\b[A-Za-z0-9+/]{20,}\b', '****[REDACTED]****', text)
-        
+        for pattern, mask in _REDACTIONS:
+            text = pattern.sub(mask, text)
         return text
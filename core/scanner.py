@@ -1,61 +1,203 @@
+import asyncio
+import multiprocessing
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import chain, repeat
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, FrozenSet, Iterator, Optional, Tuple
 from datetime import datetime
 import uuid
 
+import aiofiles
+
 from .models import ScanResult, ScanSummary, Finding, Framework
-from .rule_engine import RuleEngine
+from .rule_engine import RuleEngine, _rule_cache_dir
+from .finding_cache import FindingCache
 from .detectors import DocumentGapDetector, ConfigMisconfigDetector
 
+_SKIP_EXTENSIONS = frozenset({'.pyc', '.pyo', '.exe', '.bin', '.so', '.dylib', '.dll'})
+_DOC_EXTENSIONS = ('.md', '.txt', '.doc', '.docx')
+_CONFIG_EXTENSIONS = ('.yml', '.yaml', '.json', '.conf', '.ini', '.toml')
+_SKIP_DIRS = {'.git', '.svn', '__pycache__', 'node_modules', '.venv', 'venv'}
+_MAX_FILE_SIZE = 10 * 1024 * 1024  # Skip files > 10MB
+
+# Binary detection in the style of file(1)/ripgrep: a NUL byte or mostly control bytes in the head
+_SNIFF_SIZE = 8192
+_TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)))
+
+def _looks_binary(head: bytes) -> bool:
+    """Return True if the first bytes of a file look like binary rather than text."""
+    if not head:
+        return False
+    if b'\x00' in head:
+        return True
+    # translate(None, delete) leaves only the non-text bytes
+    return len(head.translate(None, _TEXT_BYTES)) / len(head) > 0.3
+
+# Below this many files a process pool costs more to start than it saves: starting workers
+# takes about 0.4 s and a typical source file scans inline in about 1 ms
+_PARALLEL_MIN_FILES = 500
+
+# The pool lives inside servers with running threads (event loop executors, aiofiles), where
+# forking can deadlock the children; start workers from a clean process instead
+_POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Scanner copy installed once per worker process when the scanner starts its pool
+_worker_scanner: Optional['ComplianceScanner'] = None
+
+def _init_worker(scanner: 'ComplianceScanner'):
+    """Process pool initializer: keep the scanner for every file this worker scans."""
+    global _worker_scanner
+    _worker_scanner = scanner
+
+def _scan_file_in_worker(file_path: Path, frameworks: Optional[FrozenSet[Framework]]) -> List[Finding]:
+    """Scan one file with the worker's scanner."""
+    return _worker_scanner._scan_single_file(file_path, frameworks)
+
+def _scan_content_in_worker(file_path: Path, data: bytes, frameworks: Optional[FrozenSet[Framework]]) -> List[Finding]:
+    """Scan one file's already-read bytes with the worker's scanner."""
+    return _worker_scanner._scan_content(file_path, data, frameworks)
+
+@lru_cache(maxsize=None)
+def _issue_tags(rule_id: str, why_it_matters: str) -> FrozenSet[str]:
+    """Classify a rule into the issue patterns used for recommendations.
+    
+    Both inputs are fixed per rule, so the lowercasing and substring tests run once per rule
+    rather than once per finding.
+    """
+    rule_id = rule_id.lower()
+    tags = set()
+    if "pii" in rule_id or "personal" in why_it_matters.lower():
+        tags.add("pii")
+    if "secret" in rule_id or "api" in rule_id:
+        tags.add("secret")
+    return frozenset(tags)
+
 class ComplianceScanner:
-    def __init__(self, rules_dir: str = "rules"):
-        self.rule_engine = RuleEngine(rules_dir)
+    def __init__(self, rules_dir: str = "rules", max_workers: int = 1, rule_cache: bool = True,
+                 result_cache: bool = True):
+        self.rule_engine = RuleEngine(rules_dir, use_cache=rule_cache)
+        # Findings of unchanged files are reused across scans until the rules change
+        self.finding_cache = (
+            FindingCache(_rule_cache_dir() / "results.sqlite", self.rule_engine.rules_hash) if result_cache else None
+        )
         self.doc_detector = DocumentGapDetector()
         self.config_detector = ConfigMisconfigDetector()
+        # Extension -> (detector scan method, frameworks it can report on), so per-file dispatch
+        # is one dict lookup and a framework-filtered scan can skip a detector outright
+        doc = (self.doc_detector.scan_document, frozenset(DocumentGapDetector.REQUIRED_SECTIONS))
+        config = (self.config_detector.scan_config,
+                  frozenset(check[1] for check in ConfigMisconfigDetector.CHECKS.values()))
+        self._dispatch: Dict[str, Tuple[Tuple[Callable[[Path, str], List[Finding]], FrozenSet[Framework]], ...]] = {}
+        for extensions, detector in ((_DOC_EXTENSIONS, doc), (_CONFIG_EXTENSIONS, config)):
+            for ext in extensions:
+                self._dispatch[ext] = self._dispatch.get(ext, ()) + (detector,)
+        # Worker processes for large scans. Inline by default: the pool's start method re-imports the
+        # caller's main module, so only entry points with a __main__ guard (cli.py, app.py) opt in
+        self.max_workers = max_workers
+        # Started on the first large scan and reused, so workers unpickle the scanner only once
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def __getstate__(self):
+        # Workers get the scanner without the parent's pool
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        return state
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Return the worker pool, starting it on first use."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context(_POOL_START_METHOD),
+                                             initializer=_init_worker, initargs=(self,))
+        return self._pool
+    
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
     
     def scan_paths(self, paths: List[str], frameworks: List[Framework] = None) -> ScanResult:
         """Scan the given paths for compliance issues."""
         start_time = time.time()
         scan_id = str(uuid.uuid4())
         
-        all_findings = []
-        files_scanned = 0
+        files = list(self._collect_paths(paths))
+        files_scanned = len(files)
+        selected = frozenset(frameworks) if frameworks else None
         
-        for path_str in paths:
-            path = Path(path_str)
-            if path.is_file():
-                findings = self._scan_single_file(path)
-                all_findings.extend(findings)
-                files_scanned += 1
-            elif path.is_dir():
-                for file_path in path.rglob('*'):
-                    if file_path.is_file() and not self._should_skip_file(file_path):
-                        findings = self._scan_single_file(file_path)
-                        all_findings.extend(findings)
-                        files_scanned += 1
+        # Files are independent: fan out to worker processes when there are enough to pay for the pool
+        if self.max_workers > 1 and len(files) > _PARALLEL_MIN_FILES:
+            try:
+                per_file = list(self._get_pool().map(_scan_file_in_worker, files, repeat(selected), chunksize=32))
+            except BrokenProcessPool:
+                # A dead worker breaks the pool for good; start a fresh one on the next scan
+                self._pool = None
+                raise
+        else:
+            per_file = [self._scan_single_file(file_path, selected) for file_path in files]
+        
+        return self._build_result(scan_id, start_time, paths, files_scanned, per_file, frameworks)
+    
+    async def scan_paths_async(self, paths: List[str], frameworks: List[Framework] = None,
+                               max_open_files: int = 64) -> ScanResult:
+        """Scan the given paths for compliance issues without blocking the event loop.
+        
+        Files are read through aiofiles, at most max_open_files at a time, and scanned in the
+        worker pool (or a thread for small scans), so reads from slow storage overlap with
+        scanning. Results match scan_paths.
+        """
+        start_time = time.time()
+        scan_id = str(uuid.uuid4())
+        loop = asyncio.get_running_loop()
+        
+        files = await loop.run_in_executor(None, lambda: list(self._collect_paths(paths)))
+        files_scanned = len(files)
+        selected = frozenset(frameworks) if frameworks else None
+        
+        if self.max_workers > 1 and len(files) > _PARALLEL_MIN_FILES:
+            executor, scan_content = self._get_pool(), _scan_content_in_worker
+        else:
+            executor, scan_content = None, self._scan_content
+        semaphore = asyncio.Semaphore(max_open_files)
         
-        # Filter by frameworks if specified
-        if frameworks:
-            all_findings = [f for f in all_findings if f.framework in frameworks]
+        async def scan_file(file_path: Path) -> List[Finding]:
+            # Held until the file is scanned, which also bounds how much read data is in flight
+            async with semaphore:
+                data = await self._read_file_async(file_path)
+                if data is None:
+                    return []
+                return await loop.run_in_executor(executor, scan_content, file_path, data, selected)
         
-        # Deduplicate findings
-        all_findings = self._deduplicate_findings(all_findings)
+        try:
+            per_file = await asyncio.gather(*(scan_file(file_path) for file_path in files))
+        except BrokenProcessPool:
+            self._pool = None
+            raise
+        
+        return self._build_result(scan_id, start_time, paths, files_scanned, per_file, frameworks)
+    
+    def _build_result(self, scan_id: str, start_time: float, paths: List[str], files_scanned: int,
+                      per_file: List[List[Finding]], frameworks: Optional[List[Framework]]) -> ScanResult:
+        """Assemble the scan result from the per-file findings."""
+        all_findings = list(chain.from_iterable(per_file))
         
-        # Sort by severity (critical -> low)
-        severity_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
-        all_findings.sort(key=lambda x: severity_order.get(x.severity, 4))
+        # Filter, deduplicate, order by severity and tally in one pass over the findings
+        all_findings, severity_counts, framework_counts, pattern_counts = self._aggregate_findings(all_findings, frameworks)
         
         # Generate summary
         scan_duration = time.time() - start_time
-        summary = self._generate_summary(files_scanned, all_findings, scan_duration)
+        summary = self._generate_summary(files_scanned, all_findings, severity_counts, framework_counts, scan_duration)
         
-        # Get top risks (critical and high severity)
-        top_risks = [f for f in all_findings if f.severity in ["critical", "high"]][:10]
+        # Get top risks (critical and high severity lead the ordered findings)
+        top_risks = all_findings[:min(10, severity_counts["critical"] + severity_counts["high"])]
         
         # Generate recommendations
-        recommendations = self._generate_recommendations(all_findings)
+        recommendations = self._generate_recommendations(severity_counts, pattern_counts)
         
         return ScanResult(
             scan_id=scan_id,
@@ -67,68 +209,155 @@ class ComplianceScanner:
             recommendations=recommendations
         )
     
-    def _scan_single_file(self, file_path: Path) -> List[Finding]:
-        """Scan a single file with all applicable detectors."""
+    def _collect_paths(self, paths: List[str]) -> Iterator[Path]:
+        """Yield every file to scan: explicit files as given, directories walked recursively."""
+        for path_str in paths:
+            path = Path(path_str)
+            if path.is_file():
+                yield path
+            elif path.is_dir():
+                for file_path in self._walk(path_str):
+                    yield Path(file_path)
+    
+    def _walk(self, root: str) -> Iterator[str]:
+        """Yield paths of scannable files under root, pruning skipped directories without descending."""
+        stack = [root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    # DirEntry caches its type from the directory listing, so these checks cost no stat call
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file() and not self._should_skip_entry(entry):
+                        yield entry.path
+    
+    def _scan_single_file(self, file_path: Path, frameworks: Optional[FrozenSet[Framework]] = None) -> List[Finding]:
+        """Scan a single file with all applicable detectors.
+        
+        When frameworks is given, only rules and detectors for those frameworks run.
+        """
+        data = self._read_file(file_path)
+        if data is None:
+            return []
+        return self._scan_content(file_path, data, frameworks)
+    
+    def _read_file(self, file_path: Path) -> Optional[bytes]:
+        """Return the file's bytes, or None if it is unreadable, binary or over the size cap."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            with open(file_path, 'rb') as f:
+                # Sniff the head first so binaries are never read in full or decoded
+                head = f.read(_SNIFF_SIZE)
+                if _looks_binary(head):
+                    return None
+                # Bounded read: explicitly named files never went through the size check
+                data = head + f.read(_MAX_FILE_SIZE + 1 - len(head))
         except Exception:
-            return []
+            return None
+        if len(data) > _MAX_FILE_SIZE:
+            return None
+        return data
+    
+    async def _read_file_async(self, file_path: Path) -> Optional[bytes]:
+        """Async counterpart of _read_file."""
+        try:
+            async with aiofiles.open(file_path, 'rb') as f:
+                head = await f.read(_SNIFF_SIZE)
+                if _looks_binary(head):
+                    return None
+                data = head + await f.read(_MAX_FILE_SIZE + 1 - len(head))
+        except Exception:
+            return None
+        if len(data) > _MAX_FILE_SIZE:
+            return None
+        return data
+    
+    def _scan_content(self, file_path: Path, data: bytes, frameworks: Optional[FrozenSet[Framework]] = None) -> List[Finding]:
+        """Return the findings for a file's bytes, from the finding cache when the file is unchanged."""
+        if self.finding_cache is None:
+            return self._run_detectors(file_path, data, frameworks)
+        
+        cache_key = self.finding_cache.key(file_path, data, frameworks)
+        findings = self.finding_cache.get(cache_key)
+        if findings is None:
+            findings = self._run_detectors(file_path, data, frameworks)
+            self.finding_cache.put(cache_key, findings)
+        return findings
+    
+    def _run_detectors(self, file_path: Path, data: bytes, frameworks: Optional[FrozenSet[Framework]] = None) -> List[Finding]:
+        """Run the applicable detectors over a file's bytes."""
+        # One-shot decode; translate newlines the way text mode would, only when there are any \r
+        content = data.decode('utf-8', errors='ignore')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
         
         findings = []
         
         # Rule engine scanning
-        findings.extend(self.rule_engine.scan_file(file_path, content))
+        rule_engine = self.rule_engine.view(frameworks) if frameworks else self.rule_engine
+        findings.extend(rule_engine.scan_file(file_path, content))
         
-        # Document gap detection for policy files
-        if file_path.suffix in ['.md', '.txt', '.doc', '.docx']:
-            findings.extend(self.doc_detector.scan_document(file_path, content))
-        
-        # Configuration file analysis
-        if file_path.suffix in ['.yml', '.yaml', '.json', '.conf', '.ini', '.toml']:
-            findings.extend(self.config_detector.scan_config(file_path, content))
+        # Document gap detection for policy files, configuration analysis for config files
+        for scan, detector_frameworks in self._dispatch.get(os.path.splitext(str(file_path))[1], ()):
+            if not frameworks or not frameworks.isdisjoint(detector_frameworks):
+                findings.extend(scan(file_path, content))
         
         return findings
     
-    def _should_skip_file(self, file_path: Path) -> bool:
-        """Determine if a file should be skipped during scanning."""
-        skip_extensions = {'.pyc', '.pyo', '.exe', '.bin', '.so', '.dylib', '.dll'}
-        skip_dirs = {'.git', '.svn', '__pycache__', 'node_modules', '.venv', 'venv'}
-        
-        if file_path.suffix in skip_extensions:
-            return True
-        
-        if any(part in skip_dirs for part in file_path.parts):
+    def _should_skip_entry(self, entry: os.DirEntry) -> bool:
+        """Determine if a directory entry for a file should be skipped during scanning."""
+        if os.path.splitext(entry.name)[1] in _SKIP_EXTENSIONS:
             return True
         
         # Skip binary files (basic check)
-        if file_path.stat().st_size > 10 * 1024 * 1024:  # Skip files > 10MB
+        try:
+            return entry.stat().st_size > _MAX_FILE_SIZE
+        except OSError:
             return True
-        
-        return False
     
-    def _deduplicate_findings(self, findings: List[Finding]) -> List[Finding]:
-        """Remove duplicate findings based on file path and rule."""
-        seen = set()
-        deduplicated = []
+    def _aggregate_findings(self, findings: List[Finding], frameworks: Optional[List[Framework]]
+                            ) -> Tuple[List[Finding], Dict[str, int], Dict[str, int], Dict[str, int]]:
+        """Filter, deduplicate, order and count findings in a single pass.
         
-        for finding in findings:
-            key = (finding.file_path, finding.rule_id, finding.line_range)
-            if key not in seen:
-                seen.add(key)
-                deduplicated.append(finding)
-        
-        return deduplicated
-    
-    def _generate_summary(self, files_scanned: int, findings: List[Finding], duration: float) -> ScanSummary:
-        """Generate scan summary statistics."""
-        severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+        Returns the findings ordered critical -> low (stable within a severity), counts by
+        severity, counts by framework, and counts of the issue patterns behind recommendations.
+        """
+        wanted = set(frameworks) if frameworks else None
+        by_severity = {"critical": [], "high": [], "medium": [], "low": []}
         framework_counts = {"iso27001": 0, "soc2": 0, "gdpr": 0}
+        pattern_counts = {"pii": 0, "secret": 0, "config": 0}
+        seen = set()
         
         for finding in findings:
-            severity_counts[finding.severity] += 1
+            if wanted is not None and finding.framework not in wanted:
+                continue
+            
+            # Deduplicate on file path, rule and line range with a single hash per finding
+            seen_count = len(seen)
+            seen.add((finding.file_path, finding.rule_id, finding.line_range))
+            if len(seen) == seen_count:
+                continue
+            
+            by_severity[finding.severity].append(finding)
             framework_counts[finding.framework] += 1
+            
+            for tag in _issue_tags(finding.rule_id, finding.why_it_matters):
+                pattern_counts[tag] += 1
+            if finding.framework == Framework.SOC2 and finding.severity in ("critical", "high"):
+                pattern_counts["config"] += 1
         
+        # Concatenating the severity buckets is a stable sort by severity
+        ordered = list(chain.from_iterable(by_severity.values()))
+        severity_counts = {severity: len(bucket) for severity, bucket in by_severity.items()}
+        return ordered, severity_counts, framework_counts, pattern_counts
+    
+    def _generate_summary(self, files_scanned: int, findings: List[Finding], severity_counts: Dict[str, int],
+                          framework_counts: Dict[str, int], duration: float) -> ScanSummary:
+        """Generate scan summary statistics."""
         return ScanSummary(
             total_files_scanned=files_scanned,
             total_findings=len(findings),
@@ -137,12 +366,12 @@ class ComplianceScanner:
             scan_duration_seconds=round(duration, 2)
         )
     
-    def _generate_recommendations(self, findings: List[Finding]) -> List[str]:
-        """Generate prioritized recommendations based on findings."""
+    def _generate_recommendations(self, severity_counts: Dict[str, int], pattern_counts: Dict[str, int]) -> List[str]:
+        """Generate prioritized recommendations based on finding counts."""
         recommendations = []
         
-        critical_count = sum(1 for f in findings if f.severity == "critical")
-        high_count = sum(1 for f in findings if f.severity == "high")
+        critical_count = severity_counts["critical"]
+        high_count = severity_counts["high"]
         
         if critical_count > 0:
             recommendations.append(f"🚨 Address {critical_count} critical security issues immediately")
@@ -151,16 +380,13 @@ class ComplianceScanner:
             recommendations.append(f"⚠️  Review and remediate {high_count} high-severity findings")
         
         # Common issue patterns
-        pii_findings = [f for f in findings if "pii" in f.rule_id.lower() or "personal" in f.why_it_matters.lower()]
-        if len(pii_findings) > 3:
+        if pattern_counts["pii"] > 3:
             recommendations.append("🔒 Implement comprehensive PII handling and masking procedures")
         
-        secret_findings = [f for f in findings if "secret" in f.rule_id.lower() or "api" in f.rule_id.lower()]
-        if len(secret_findings) > 2:
+        if pattern_counts["secret"] > 2:
             recommendations.append("🔑 Audit and rotate exposed credentials, implement secret management")
         
-        config_findings = [f for f in findings if f.framework == Framework.SOC2 and f.severity in ["critical", "high"]]
-        if len(config_findings) > 2:
+        if pattern_counts["config"] > 2:
             recommendations.append("⚙️  Review system configurations against security baselines")
         
         return recommendations[:5]  # Top 5 recommendations
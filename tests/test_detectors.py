@@ -1,6 +1,7 @@
 import pytest
 from pathlib import Path
 from core.detectors import DocumentGapDetector, ConfigMisconfigDetector, luhn_check
+from core.models import Framework
 
 def test_luhn_check():
     """Test credit card validation using Luhn algorithm."""
@@ -89,3 +90,103 @@ def test_config_detector_public_storage():
     # Should detect public storage
     public_findings = [f for f in findings if f.rule_id == "public_storage"]
     assert len(public_findings) > 0
+
+def test_config_detector_multiple_issues():
+    """Test that each misconfiguration is reported once per file."""
+    detector = ConfigMisconfigDetector()
+    
+    config_content = """
+    [server]
+    ssl = false
+    tls = false
+    ssl_cipher = RC4-SHA
+    public = true
+    """
+    
+    findings = detector.scan_config(Path("server.conf"), config_content)
+    
+    rule_ids = [f.rule_id for f in findings]
+    assert rule_ids == ["disabled_tls", "public_storage", "weak_cipher"]
+
+def test_luhn_check_with_separators():
+    """Test that spaces and dashes in card numbers are ignored."""
+    assert luhn_check("4532 0151 1283 0366") == True
+    assert luhn_check("5555-5555-5555-4444") == True
+    assert luhn_check("4532 0151 1283 0367") == False
+    
+    with pytest.raises(ValueError):
+        luhn_check("4532-0151-1283-03a6")
+
+def test_document_gap_detector_overlapping_keywords():
+    """Test that keywords are matched case-insensitively, including overlapping ones."""
+    detector = DocumentGapDetector()
+    
+    content = """
+    Security Policy
+    
+    We run a DPIA before new processing and enforce logical access control.
+    """
+    
+    findings = detector.scan_document(Path("security-policy.md"), content)
+    control_ids = {(f.framework, f.control_id) for f in findings}
+    
+    assert (Framework.GDPR, "Article 35") not in control_ids
+    assert (Framework.ISO27001, "A.9") not in control_ids
+    assert (Framework.SOC2, "CC 6.1") not in control_ids
+    assert (Framework.GDPR, "Article 5") in control_ids
+
+def test_config_detector_broad_iam_json_lists():
+    """Test structural IAM detection for JSON policies with list-valued fields."""
+    detector = ConfigMisconfigDetector()
+    
+    broad = '{"Statement": [{"Effect": "Allow", "Action": ["*"], "Resource": ["*"]}]}'
+    scoped = '{"Statement": [{"Effect": "Allow", "Action": "s3:GetObject", "Resource": "*"}]}'
+    
+    assert [f.rule_id for f in detector.scan_config(Path("broad.json"), broad)] == ["broad_iam"]
+    assert detector.scan_config(Path("scoped.json"), scoped) == []
+
+def test_config_detector_issues_on_one_line():
+    """Test that a match for one check does not hide other checks later on the same line."""
+    detector = ConfigMisconfigDetector()
+    
+    findings = detector.scan_config(
+        Path("server.conf"), 'cipher = RC4 ssl=false public=true {"Action": "*", "Resource": "*"} digest=MD5'
+    )
+    assert [f.rule_id for f in findings] == ["disabled_tls", "broad_iam", "public_storage", "weak_cipher"]
+    
+    findings = detector.scan_config(Path("b.json"), '{"cipher": "RC4", "public": true, "digest": "MD5"}')
+    assert [f.rule_id for f in findings] == ["public_storage", "weak_cipher"]
+
+def test_document_gap_detector_unicode_case_variants():
+    """Test that Unicode case variants of keywords do not break the scan."""
+    detector = DocumentGapDetector()
+    
+    findings = detector.scan_document(Path("policy.md"), "Security policy: acceſs control")
+    
+    # Keywords are compared after str.lower(), which leaves "ſ" as is
+    assert any(f.control_id == "A.9" for f in findings)
+    assert any(f.control_id == "A.16" for f in findings)
+
+def test_document_gap_detector_keyword_search_speed():
+    """Test that keyword detection is no slower than one lowercase pass per section keyword."""
+    import time
+    detector = DocumentGapDetector()
+    content = ("Security policy. Staff must follow the onboarding procedure and report issues. " * 20000)
+    keywords = [keyword for sections in DocumentGapDetector.REQUIRED_SECTIONS.values()
+                for section in sections for keyword in section['keywords']]
+    
+    def best_of(func, runs=3):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+    
+    # The original per-section check: lowercase once, then a substring search per keyword
+    def reference():
+        content_lower = content.lower()
+        return [keyword in content_lower for keyword in keywords]
+    
+    assert detector._find_keywords(content) == set()
+    assert best_of(lambda: detector._find_keywords(content)) <= 2 * best_of(reference)
@@ -0,0 +1,62 @@
+import pytest
+import sqlite3
+import time
+from pathlib import Path
+import core.finding_cache
+from core.finding_cache import FindingCache
+from core.models import Finding, Framework, Severity
+
+def _make_finding(file_path: str) -> Finding:
+    return Finding(
+        id="f-1",
+        rule_id="iso_aws_access_key",
+        framework=Framework.ISO27001,
+        control_id="A.9",
+        severity=Severity.CRITICAL,
+        file_path=file_path,
+        line_range="1-1",
+        evidence_snippet="****[REDACTED]****",
+        why_it_matters="Exposed keys",
+        remediation_steps="Rotate the key"
+    )
+
+def test_finding_cache_round_trip(tmp_path):
+    """Test that findings are returned for unchanged content only, with fresh IDs."""
+    cache = FindingCache(tmp_path / "results.sqlite", "rules-hash")
+    key = cache.key(Path("app.py"), b"content")
+    cache.put(key, [_make_finding("app.py")])
+    
+    cached = cache.get(key)
+    assert [f.rule_id for f in cached] == ["iso_aws_access_key"]
+    assert cached[0].id != "f-1"
+    
+    assert cache.get(cache.key(Path("app.py"), b"edited")) is None
+    assert cache.get(cache.key(Path("app.py"), b"content", frozenset({Framework.GDPR}))) is None
+    other_rules = FindingCache(tmp_path / "results.sqlite", "other-rules")
+    assert other_rules.get(other_rules.key(Path("app.py"), b"content")) is None
+
+def test_finding_cache_prunes_on_open(tmp_path):
+    """Test that old rows and rows beyond the cap are dropped when the database is opened."""
+    db_path = tmp_path / "results.sqlite"
+    cache = FindingCache(db_path, "rules-hash")
+    for i in range(5):
+        cache.put(cache.key(Path(f"file_{i}.py"), b"content"), [])
+    stale_key = cache.key(Path("stale.py"), b"content")
+    cache.put(stale_key, [])
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE findings SET stored_at = ? WHERE path = 'stale.py'", (time.time() - 3600,))
+    
+    pruned = FindingCache(db_path, "rules-hash", max_rows=3, max_age=60)
+    assert pruned.get(stale_key) is None
+    with sqlite3.connect(db_path) as conn:
+        paths = {row[0] for row in conn.execute("SELECT path FROM findings")}
+    assert paths == {"file_2.py", "file_3.py", "file_4.py"}
+
+def test_finding_cache_invalidated_by_code_changes(tmp_path, monkeypatch):
+    """Test that findings cached by different scanner code are not reused."""
+    cache = FindingCache(tmp_path / "results.sqlite", "rules-hash")
+    cache.put(cache.key(Path("app.py"), b"content"), [_make_finding("app.py")])
+    assert cache.get(cache.key(Path("app.py"), b"content")) is not None
+    
+    monkeypatch.setattr(core.finding_cache, "_CODE_DIGEST", "upgraded")
+    assert cache.get(cache.key(Path("app.py"), b"content")) is None
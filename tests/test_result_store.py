@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime
+import uuid
+from core.models import ScanResult, ScanSummary
+from core.result_store import ScanResultStore
+
+def _make_result() -> ScanResult:
+    return ScanResult(
+        scan_id=str(uuid.uuid4()),
+        timestamp=datetime.now(),
+        paths_scanned=["."],
+        summary=ScanSummary(
+            total_files_scanned=1,
+            total_findings=0,
+            findings_by_severity={"critical": 0, "high": 0, "medium": 0, "low": 0},
+            findings_by_framework={"iso27001": 0, "soc2": 0, "gdpr": 0},
+            scan_duration_seconds=0.01
+        ),
+        findings=[]
+    )
+
+def test_result_store_evicts_to_disk(tmp_path):
+    """Test that evicted results are reloaded from disk."""
+    store = ScanResultStore(str(tmp_path), maxsize=2)
+    results = [_make_result() for _ in range(3)]
+    for result in results:
+        store.put(result)
+    
+    # The oldest result is no longer in memory but is still retrievable
+    assert len(store._recent) == 2
+    assert results[0].scan_id not in store._recent
+    assert store.get(results[0].scan_id) == results[0]
+    
+    # A fresh store (e.g. after restart) sees everything on disk
+    restarted = ScanResultStore(str(tmp_path))
+    assert restarted.get(results[2].scan_id) == results[2]
+
+def test_result_store_rejects_unknown_ids(tmp_path):
+    """Test that unknown or malformed scan IDs are not found."""
+    store = ScanResultStore(str(tmp_path))
+    
+    assert store.get(str(uuid.uuid4())) is None
+    assert store.get("../../etc/passwd") is None
+
+def test_result_store_concurrent_put_and_get(tmp_path):
+    """Test that reads racing with evicting writes never fail."""
+    import threading
+    store = ScanResultStore(str(tmp_path), maxsize=2)
+    results = [_make_result() for _ in range(40)]
+    errors = []
+    
+    def reader():
+        try:
+            for _ in range(20):
+                for result in results:
+                    store.get(result.scan_id)
+        except Exception as e:
+            errors.append(e)
+    
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for result in results:
+        store.put(result)
+    thread.join()
+    
+    assert errors == []
+    assert len(store._recent) <= 2
@@ -1,5 +1,6 @@
 import pytest
 from pathlib import Path
+from core.models import Finding
 from core.rule_engine import RuleEngine, Rule
 
 def test_rule_engine_aws_key_detection():
@@ -83,3 +84,152 @@ def test_rule_engine_evidence_redaction():
     for finding in findings:
         assert "sensitive@example.com" not in finding.evidence_snippet
         assert "4532015112830366" not in finding.evidence_snippet
+
+def test_rule_engine_respects_file_globs():
+    """Test that rules only run against files matching their globs."""
+    engine = RuleEngine("rules")
+    
+    content = 'contact = "admin@company.org"'
+    
+    # Email rules are scoped to source files
+    assert any("email" in f.rule_id for f in engine.scan_file(Path("src/app.py"), content))
+    assert not any("email" in f.rule_id for f in engine.scan_file(Path("docs/README.md"), content))
+
+def test_rule_engine_disk_cache(tmp_path, monkeypatch):
+    """Test that compiled rules are cached on disk and invalidated when YAML changes."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    rule_file = rules_dir / "custom.yaml"
+    rule_file.write_text("""
+rules:
+  - id: custom_token
+    framework: soc2
+    control_id: CC 6.1
+    severity: high
+    pattern: 'token_[0-9]+'
+    why_it_matters: 'Tokens grant access'
+    remediation_steps: 'Rotate the token'
+""")
+    
+    first = RuleEngine(str(rules_dir))
+    assert list((tmp_path / "cache" / "compliance_check").glob(f"rules-{first.rules_hash}.pkl"))
+    
+    second = RuleEngine(str(rules_dir))
+    assert second.rules_hash == first.rules_hash
+    assert [r.id for r in second.rules] == ["custom_token"]
+    assert second.scan_file(Path("app.py"), "x = token_123")
+    
+    rule_file.write_text(rule_file.read_text().replace("custom_token", "custom_secret"))
+    third = RuleEngine(str(rules_dir))
+    assert third.rules_hash != first.rules_hash
+    assert [r.id for r in third.rules] == ["custom_secret"]
+
+def test_rule_engine_finding_ids_unique():
+    """Test that every finding gets a distinct ID."""
+    engine = RuleEngine("rules")
+    
+    content = "\n".join(f'contact_{i} = "user{i}@example.com"' for i in range(50))
+    findings = engine.scan_file(Path("contacts.py"), content)
+    
+    assert len(findings) >= 50
+    assert len({f.id for f in findings}) == len(findings)
+
+def test_rule_rejects_invalid_metadata():
+    """Test that rule metadata is validated when the rule is loaded."""
+    rule_data = {
+        'id': 'bad_rule',
+        'framework': 'soc2',
+        'control_id': 'CC 6.1',
+        'severity': 'high',
+        'pattern': 'secret',
+        'why_it_matters': 'Secrets leak',
+        'remediation_steps': 'Remove them',
+        'mapping_confidence': 'certain',
+    }
+    
+    with pytest.raises(ValueError):
+        Rule(rule_data)
+
+def test_rule_engine_without_cache(tmp_path, monkeypatch):
+    """Test that the rule cache can be bypassed."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    
+    engine = RuleEngine("rules", use_cache=False)
+    
+    assert engine.rules
+    assert not (tmp_path / "compliance_check").exists()
+
+def test_rule_engine_framework_view():
+    """Test that a framework view only applies that framework's rules and shares them."""
+    engine = RuleEngine("rules")
+    
+    content = 'AWS_KEY = "AKIA1234567890ABCDEF"\nemail = "user@example.com"\n'
+    findings = engine.scan_file(Path("app.py"), content)
+    
+    for framework in {rule.framework for rule in engine.rules}:
+        view = engine.view({framework})
+        assert view is engine.view([framework])
+        assert all(rule.framework == framework for rule in view.rules)
+        assert all(any(rule is original for original in engine.rules) for rule in view.rules)
+        
+        expected = [(f.rule_id, f.line_range) for f in findings if f.framework == framework]
+        assert [(f.rule_id, f.line_range) for f in view.scan_file(Path("app.py"), content)] == expected
+
+def test_rule_engine_applies_to_extensions(tmp_path):
+    """Test that the optional applies_to list limits a rule to the given file extensions."""
+    (tmp_path / "custom.yaml").write_text(
+        "rules:\n"
+        "  - id: py_only_secret\n"
+        "    framework: soc2\n"
+        "    control_id: CC 6.1\n"
+        "    severity: high\n"
+        "    pattern: 'hunter2'\n"
+        "    applies_to: ['.py', 'cfg']\n"
+        "    why_it_matters: 'Hard-coded passwords leak'\n"
+        "    remediation_steps: 'Use a secret manager'\n"
+    )
+    engine = RuleEngine(str(tmp_path), use_cache=False)
+    
+    content = 'password = "hunter2"'
+    assert engine.scan_file(Path("app.py"), content)
+    assert engine.scan_file(Path("setup.cfg"), content)
+    assert not engine.scan_file(Path("README.md"), content)
+    
+    with pytest.raises(ValueError):
+        Rule({
+            'id': 'bad_rule',
+            'framework': 'soc2',
+            'control_id': 'CC 6.1',
+            'severity': 'high',
+            'pattern': 'hunter2',
+            'applies_to': '.py',
+            'why_it_matters': 'Hard-coded passwords leak',
+            'remediation_steps': 'Use a secret manager',
+        })
+
+def test_rule_engine_findings_are_independent():
+    """Test that unvalidated rule findings stay independent, mutable, comparable and picklable."""
+    import pickle
+    engine = RuleEngine("rules")
+    
+    findings = engine.scan_file(Path("app.py"), 'a = "x@example.com"\nb = "y@example.com"\n')
+    assert len(findings) >= 2
+    assert findings[0].model_fields_set == set(Finding.model_fields)
+    
+    findings[0].why_it_matters = "Updated explanation"
+    findings[0].model_fields_set.discard("why_it_matters")
+    assert findings[1].why_it_matters != "Updated explanation"
+    assert findings[1].model_fields_set == set(Finding.model_fields)
+    
+    restored = pickle.loads(pickle.dumps(findings))
+    assert [f.model_dump() for f in restored] == [f.model_dump() for f in findings]
+
+def test_rule_engine_redacts_email_before_secrets():
+    """Test that an email next to a long token is masked whole, domain included."""
+    engine = RuleEngine("rules")
+    
+    redacted = engine._redact_sensitive_data("token=abcdefghijklmnopqrstuvwxyz/jane@corp.com")
+    
+    assert "corp.com" not in redacted
+    assert redacted == "token=****[REDACTED]****/****@****.***"
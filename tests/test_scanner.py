@@ -2,6 +2,8 @@ import pytest
 from pathlib import Path
 import tempfile
 import os
+import asyncio
+import core.scanner
 from core.scanner import ComplianceScanner
 from core.models import Framework
 
@@ -114,3 +116,159 @@ def test_scanner_severity_ordering():
             current_severity = severity_order.get(result.findings[i].severity, 4)
             next_severity = severity_order.get(result.findings[i + 1].severity, 4)
             assert current_severity <= next_severity
+
+def test_scanner_parallel_matches_serial(monkeypatch):
+    """Test that scanning with worker processes gives the same results as inline scanning."""
+    monkeypatch.setattr(core.scanner, "_PARALLEL_MIN_FILES", 16)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        
+        for i in range(40):
+            (temp_path / f"module_{i}.py").write_text(f'KEY = "AKIA1234567890ABCDE{i % 10}"\nemail = "u{i}@example.com"\n')
+        (temp_path / "config.yml").write_text("ssl: false\n")
+        
+        # Without the finding cache, so the parallel scan cannot just read back the serial results
+        serial = ComplianceScanner("rules", max_workers=1, result_cache=False).scan_paths([str(temp_path)])
+        scanner = ComplianceScanner("rules", max_workers=2, result_cache=False)
+        try:
+            parallel = scanner.scan_paths([str(temp_path)])
+        finally:
+            scanner.close()
+        
+        def summarize(result):
+            return [(f.file_path, f.rule_id, f.line_range) for f in result.findings]
+        
+        assert parallel.summary.total_files_scanned == serial.summary.total_files_scanned == 41
+        assert summarize(parallel) == summarize(serial)
+
+def test_scanner_pattern_recommendations():
+    """Test that recurring PII and secret findings produce recommendations."""
+    scanner = ComplianceScanner("rules")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        
+        test_file = temp_path / "contacts.py"
+        test_file.write_text("\n".join(f'api_key_{i} = "user{i}@example.com"' for i in range(5)))
+        
+        result = scanner.scan_paths([str(temp_path)])
+        
+        assert any("PII" in rec for rec in result.recommendations)
+        assert any("credentials" in rec for rec in result.recommendations)
+
+def test_scanner_skips_binary_files():
+    """Test that binary content is not scanned even when the extension looks like text."""
+    scanner = ComplianceScanner("rules")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        
+        binary_file = temp_path / "blob.txt"
+        binary_file.write_bytes(b'\x00\x01\x02AKIA1234567890ABCDEF\x00' * 10)
+        
+        assert scanner._scan_single_file(binary_file) == []
+        
+        text_file = temp_path / "keys.txt"
+        text_file.write_text('AWS_KEY = "AKIA1234567890ABCDEF"\n')
+        
+        assert any("aws" in f.rule_id for f in scanner._scan_single_file(text_file))
+
+def test_scanner_reuses_worker_pool(monkeypatch):
+    """Test that successive large scans share one worker pool until the scanner is closed."""
+    monkeypatch.setattr(core.scanner, "_PARALLEL_MIN_FILES", 16)
+    scanner = ComplianceScanner("rules", max_workers=2)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        
+        for i in range(20):
+            (temp_path / f"module_{i}.py").write_text(f'email = "u{i}@example.com"\n')
+        
+        try:
+            first = scanner.scan_paths([str(temp_path)])
+            pool = scanner._pool
+            second = scanner.scan_paths([str(temp_path)], [Framework.ISO27001])
+            
+            assert pool is not None and scanner._pool is pool
+            assert len(first.findings) == len(second.findings) == 20
+        finally:
+            scanner.close()
+        
+        assert scanner._pool is None
+
+def test_scanner_async_matches_sync(monkeypatch):
+    """Test that the async front end finds the same issues as scan_paths, inline and in workers."""
+    monkeypatch.setattr(core.scanner, "_PARALLEL_MIN_FILES", 16)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        
+        for i in range(20):
+            (temp_path / f"module_{i}.py").write_text(f'KEY = "AKIA1234567890ABCDE{i % 10}"\nemail = "u{i}@example.com"\n')
+        (temp_path / "config.yml").write_text("ssl: false\n")
+        (temp_path / "blob.txt").write_bytes(b'\x00AKIA1234567890ABCDEF' * 10)
+        
+        def summarize(result):
+            return [(f.file_path, f.rule_id, f.line_range) for f in result.findings]
+        
+        for max_workers in (1, 2):
+            scanner = ComplianceScanner("rules", max_workers=max_workers, result_cache=False)
+            try:
+                expected = scanner.scan_paths([str(temp_path)], [Framework.ISO27001])
+                result = asyncio.run(scanner.scan_paths_async([str(temp_path)], [Framework.ISO27001], max_open_files=4))
+            finally:
+                scanner.close()
+            
+            assert result.summary.total_files_scanned == expected.summary.total_files_scanned == 22
+            assert summarize(result) == summarize(expected)
+
+def test_scanner_reuses_findings_for_unchanged_files(tmp_path, monkeypatch):
+    """Test that unchanged files are served from the finding cache and edited files are rescanned."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "keys.py").write_text('AWS_KEY = "AKIA1234567890ABCDEF"\n')
+    (source_dir / "contacts.py").write_text('email = "user@example.com"\n')
+    
+    def summarize(result):
+        return sorted((f.file_path, f.rule_id, f.line_range, f.evidence_snippet) for f in result.findings)
+    
+    first = ComplianceScanner("rules", max_workers=1).scan_paths([str(source_dir)])
+    
+    # Record which files a fresh scanner actually runs the detectors on
+    scanner = ComplianceScanner("rules", max_workers=1)
+    scanned = []
+    run_detectors = scanner._run_detectors
+    
+    def recording_run_detectors(file_path, *args):
+        scanned.append(file_path.name)
+        return run_detectors(file_path, *args)
+    
+    monkeypatch.setattr(scanner, "_run_detectors", recording_run_detectors)
+    (source_dir / "contacts.py").write_text('email = "other@example.com"\n')
+    second = scanner.scan_paths([str(source_dir)])
+    
+    assert scanned == ["contacts.py"]
+    assert summarize(second) == summarize(first)
+    assert not {f.id for f in first.findings} & {f.id for f in second.findings}
+    
+    # A different framework selection is cached separately
+    scanner.scan_paths([str(source_dir)], [Framework.GDPR])
+    assert sorted(scanned) == ["contacts.py", "contacts.py", "keys.py"]
+    
+    uncached = ComplianceScanner("rules", max_workers=1, result_cache=False)
+    assert uncached.finding_cache is None
+    assert summarize(uncached.scan_paths([str(source_dir)])) == summarize(first)
+
+def test_scanner_scans_inline_by_default():
+    """Test that library callers get no worker processes unless they ask for them."""
+    scanner = ComplianceScanner("rules", result_cache=False)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for i in range(30):
+            (Path(temp_dir) / f"module_{i}.py").write_text(f'email = "u{i}@example.com"\n')
+        
+        result = scanner.scan_paths([temp_dir])
+    
+    assert scanner.max_workers == 1
+    assert scanner._pool is None
+    assert result.summary.total_files_scanned == 30